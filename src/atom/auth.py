@@ -28,8 +28,7 @@ class BasicAuth(object):
   """Sets the Authorization header as defined in RFC1945"""
 
   def __init__(self, user_id, password):
-    self.basic_cookie = base64.encodestring(
-        '%s:%s' % (user_id, password)).strip()
+    self.basic_cookie = base64.b64encode('%s:%s' % (user_id, password))
 
   def modify_request(self, http_request):
     http_request.headers['Authorization'] = 'Basic %s' % self.basic_cookie
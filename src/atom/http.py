@@ -42,6 +42,8 @@ import atom.url
 import atom.http_interface
 import socket
 import base64
+import select
+import threading
 import atom.http_core
 ssl_imported = False
 ssl = None
@@ -62,6 +64,14 @@ class TestConfigurationError(Exception):
 
 
 DEFAULT_CONTENT_TYPE = 'application/atom+xml'
+# String bodies larger than this many bytes are sent to plain http servers as
+# a buffer so that httplib does not copy them while joining them to the
+# request headers. ssl sockets copy the body when sending it anyway.
+LARGE_BODY_SIZE = 65536
+# Requests which are retried once on a new connection if a reused keep-alive
+# connection turns out to have been closed by the server. Other methods are
+# not retried since the server may already have acted on the request.
+RETRYABLE_METHODS = ('GET', 'HEAD')
 
 
 class HttpClient(atom.http_interface.GenericHttpClient):
@@ -72,6 +82,12 @@ class HttpClient(atom.http_interface.GenericHttpClient):
   def __init__(self, headers=None):
     self.debug = False
     self.headers = headers or {}
+    # Idle keep-alive connections, keyed by (protocol, host, port), each
+    # stored with the last response read from it. A connection is removed
+    # while a request is using it, so threads sharing this client never
+    # write to the same connection.
+    self._connections = {}
+    self._connections_lock = threading.Lock()
 
   def request(self, operation, url, data=None, headers=None):
     """Performs an HTTP call to the server, supports GET, POST, PUT, and 
@@ -130,45 +146,62 @@ class HttpClient(atom.http_interface.GenericHttpClient):
             'parameter because it was not a string or atom.url.Url')
     
     connection = self._prepare_connection(url, all_headers)
-
-    if self.debug:
-      connection.debuglevel = 1
-
-    connection.putrequest(operation, self._get_access_url(url), 
-        skip_host=True)
-    if url.port is not None:
-      connection.putheader('Host', '%s:%s' % (url.host, url.port))
-    else:
-      connection.putheader('Host', url.host)
-
-    # Overcome a bug in Python 2.4 and 2.5
-    # httplib.HTTPConnection.putrequest adding
-    # HTTP request header 'Host: www.google.com:443' instead of
-    # 'Host: www.google.com', and thus resulting the error message
-    # 'Token invalid - AuthSub token has wrong scope' in the HTTP response.
-    if (url.protocol == 'https' and int(url.port or 443) == 443 and
-        hasattr(connection, '_buffer') and
-        isinstance(connection._buffer, list)):
-      header_line = 'Host: %s:443' % url.host
-      replacement_header_line = 'Host: %s' % url.host
+    pooled = self._uses_connection_pool(url)
+    # A pooled connection which already has a socket was used for an earlier
+    # request, and the server may have closed it while it was idle.
+    reused = pooled and connection.sock is not None
+    try:
       try:
-        connection._buffer[connection._buffer.index(header_line)] = (
-            replacement_header_line)
-      except ValueError:  # header_line missing from connection._buffer
-        pass
-
-    # Send the HTTP headers.
-    for header_name in all_headers:
-      connection.putheader(header_name, all_headers[header_name])
-    connection.endheaders()
-
-    # If there is data, send it in the request.
-    if data:
-      if isinstance(data, list):
-        for data_part in data:
-          _send_data_part(data_part, connection)
-      else:
-        _send_data_part(data, connection)
+        response = self._send_request(connection, operation, url, all_headers,
+                                      data)
+      except (httplib.BadStatusLine, socket.error):
+        connection.close()
+        if (not reused or operation not in RETRYABLE_METHODS or
+            (data and not isinstance(data, types.StringTypes))):
+          raise
+        connection = self._create_connection(url)
+        response = self._send_request(connection, operation, url, all_headers,
+                                      data)
+    except:
+      # Never leave a connection half way through a request.
+      connection.close()
+      raise
+    if pooled:
+      self._release_connection(url, connection, response)
+    return response
+
+  def _send_request(self, connection, operation, url, headers, data):
+    """Writes the request to the connection and returns the response."""
+    connection.set_debuglevel(int(bool(self.debug)))
+
+    # Send 'Host: www.google.com' rather than 'Host: www.google.com:443' for
+    # the default https port, otherwise the server responds with 'Token
+    # invalid - AuthSub token has wrong scope'.
+    if url.port is not None and not (
+        url.protocol == 'https' and int(url.port or 443) == 443):
+      headers['Host'] = '%s:%s' % (url.host, url.port)
+    else:
+      headers['Host'] = url.host
+
+    # The request line must be a byte string. httplib joins a string body to
+    # it, and a unicode URL would make that fail for a non-ASCII body.
+    access_url = str(self._get_access_url(url))
+
+    # Send the request line, the HTTP headers and a string body in a single
+    # call. Other kinds of data are sent after the headers.
+    if (url.protocol != 'https' and isinstance(data, str) and
+        len(data) > LARGE_BODY_SIZE):
+      connection.request(operation, access_url, buffer(data), headers)
+    elif isinstance(data, types.StringTypes):
+      connection.request(operation, access_url, data, headers)
+    else:
+      connection.request(operation, access_url, None, headers)
+      if data:
+        if isinstance(data, list):
+          for data_part in data:
+            _send_data_part(data_part, connection)
+        else:
+          _send_data_part(data, connection)
 
     # Return the HTTP Response from the server.
     return connection.getresponse()
@@ -180,6 +213,48 @@ class HttpClient(atom.http_interface.GenericHttpClient):
       else:
         raise atom.http_interface.UnparsableUrlObject('Unable to parse url '
             'parameter because it was not a string or atom.url.Url')
+    connection = self._checkout_connection(url)
+    if connection is None:
+      connection = self._create_connection(url)
+    return connection
+
+  def _uses_connection_pool(self, url):
+    """Returns True if connections for this URL are kept open for reuse."""
+    return True
+
+  def _checkout_connection(self, url):
+    """Removes an idle connection to the URL's server from the pool.
+
+    Returns None if there is no connection whose last response has been
+    fully read, or if the server has closed the pooled connection.
+    """
+    self._connections_lock.acquire()
+    try:
+      pooled = self._connections.pop(_get_connection_key(url), None)
+    finally:
+      self._connections_lock.release()
+    if pooled is None:
+      return None
+    connection, last_response = pooled
+    if not last_response.isclosed():
+      # The caller is still reading the last response through this
+      # connection's socket, so it is left open. The response closes it once
+      # it has been read.
+      return None
+    if _is_connection_dropped(connection):
+      connection.close()
+      return None
+    return connection
+
+  def _release_connection(self, url, connection, response):
+    """Returns a connection to the pool once its response has been sent."""
+    self._connections_lock.acquire()
+    try:
+      self._connections[_get_connection_key(url)] = (connection, response)
+    finally:
+      self._connections_lock.release()
+
+  def _create_connection(self, url):
     if url.protocol == 'https':
       if not url.port:
         return httplib.HTTPSConnection(url.host)
@@ -277,10 +352,35 @@ class ProxiedHttpClient(HttpClient):
 
         return httplib.HTTPConnection(proxy_url.host, int(proxy_url.port))
 
+  def _uses_connection_pool(self, url):
+    # Connections to a proxy are not reused.
+    return not os.environ.get('%s_proxy' % url.protocol)
+
   def _get_access_url(self, url):
     return url.to_string()
 
 
+def _is_connection_dropped(connection):
+  """Returns True if the server has closed an idle connection.
+
+  An idle keep-alive socket only becomes readable when the server closes
+  it, so a readable socket cannot be used for another request.
+  """
+  if connection.sock is None:
+    # httplib opens a new socket for the next request.
+    return False
+  try:
+    return bool(select.select([connection.sock], [], [], 0)[0])
+  except (select.error, socket.error):
+    return True
+
+
+def _get_connection_key(url):
+  """Returns the key under which a connection to this URL's server is pooled.
+  """
+  return (url.protocol, url.host, url.port)
+
+
 def _get_proxy_auth(proxy_settings):
   """Returns proxy authentication string for header.
 
@@ -317,9 +417,8 @@ def _get_proxy_auth(proxy_settings):
         proxy_username = protocol_and_proxy_auth[0]
         proxy_password = protocol_and_proxy_auth[1]
   if proxy_username:
-    user_auth = base64.encodestring('%s:%s' % (proxy_username,
-                                               proxy_password))
-    return 'Basic %s\r\n' % (user_auth.strip())
+    user_auth = base64.b64encode('%s:%s' % (proxy_username, proxy_password))
+    return 'Basic %s\r\n' % (user_auth,)
   else:
     return ''
 
@@ -33,10 +33,12 @@ __author__ = 'api.jscudder (Jeff Scudder)'
 import atom.http_interface
 import atom.url
 import atom.http
+import atom.http_core
 import atom.token_store
 
 import os
 import httplib
+import StringIO
 import urllib
 import re
 import base64
@@ -123,8 +125,8 @@ class AtomService(object):
     if username is not None and password is not None:
       if scopes is None:
         scopes = [atom.token_store.SCOPE_ALL]
-      base_64_string = base64.encodestring('%s:%s' % (username, password))
-      token = BasicAuthToken('Basic %s' % base_64_string.strip(), 
+      base_64_string = base64.b64encode('%s:%s' % (username, password))
+      token = BasicAuthToken('Basic %s' % base_64_string, 
           scopes=[atom.token_store.SCOPE_ALL])
       if self.auto_set_current_token:
         self.current_token = token
@@ -163,13 +165,21 @@ class AtomService(object):
         url = atom.url.parse_url(url)
 
     if url_params:
-      for name, value in url_params.iteritems():
-        url.params[name] = value
+      url.params.update(url_params)
 
     all_headers = self.additional_headers.copy()
     if headers:
       all_headers.update(headers)
 
+    # Serialize XML objects only once so that the same string is used to
+    # calculate the Content-Length and as the request body.
+    if data is not None and not (isinstance(data, (str, unicode, list)) or
+                                 hasattr(data, 'read')):
+      if ElementTree.iselement(data):
+        data = ElementTree.tostring(data)
+      else:
+        data = str(data)
+
     # If the list of headers does not include a Content-Length, attempt to
     # calculate it based on the data object.
     if data and 'Content-Length' not in all_headers:
@@ -226,6 +236,35 @@ class AtomService(object):
     return self.request('GET', uri, data=None, headers=extra_headers, 
                         url_params=url_params)
 
+  def GetResponses(self, uris, extra_headers=None, url_params=None):
+    """Performs a GET request for each URI and reads all of the responses.
+
+    The requests are made one after another, reusing the HTTP client's
+    keep-alive connection to each server. Each response body is read before
+    the next request is sent. This does not use GData batch feeds.
+
+    Args:
+      uris: list of strings The URIs to query, as in Get.
+      extra_headers: dict (optional) Extra HTTP headers to be included in
+                     every GET request.
+      url_params: dict (optional) Additional URL parameters to be included
+                  in every query.
+
+    Returns:
+      A list of responses in the same order as uris. Each has status and
+      reason members, a read method which returns the body and a getheader
+      method which, like httplib.HTTPResponse, ignores the case of the
+      header name.
+    """
+    responses = []
+    for uri in uris:
+      # Use request rather than Get, which subclasses such as GDataService
+      # override to parse the response.
+      response = self.request('GET', uri, data=None, headers=extra_headers,
+                              url_params=url_params)
+      responses.append(_ReadHttpResponse(response))
+    return responses
+
   def Post(self, data, uri, extra_headers=None, url_params=None, 
            escape_params=True, content_type='application/atom+xml'):
     """Insert data into an APP server at the given URI.
@@ -251,10 +290,11 @@ class AtomService(object):
     Returns:
       httplib.HTTPResponse Server's response to the POST request.
     """
-    if extra_headers is None:
-      extra_headers = {}
     if content_type:
-      extra_headers['Content-Type'] = content_type
+      if extra_headers is None:
+        extra_headers = {'Content-Type': content_type}
+      else:
+        extra_headers['Content-Type'] = content_type
     return self.request('POST', uri, data=data, headers=extra_headers, 
                         url_params=url_params)
 
@@ -283,10 +323,11 @@ class AtomService(object):
     Returns:
       httplib.HTTPResponse Server's response to the PUT request.
     """
-    if extra_headers is None:
-      extra_headers = {}
     if content_type:
-      extra_headers['Content-Type'] = content_type
+      if extra_headers is None:
+        extra_headers = {'Content-Type': content_type}
+      else:
+        extra_headers['Content-Type'] = content_type
     return self.request('PUT', uri, data=data, headers=extra_headers, 
                         url_params=url_params)
 
@@ -317,6 +358,26 @@ class AtomService(object):
                         url_params=url_params)
 
 
+class _ReadHttpResponse(atom.http_interface.HttpResponse):
+  """Holds a response whose body has already been read from the server.
+
+  Header names are matched without regard to case, as in
+  httplib.HTTPResponse.getheader.
+  """
+
+  def __init__(self, response):
+    headers = {}
+    for name, value in dict(atom.http_core.get_headers(response)).iteritems():
+      headers[name.lower()] = value
+    # Wrap the body so that an empty body can still be read.
+    atom.http_interface.HttpResponse.__init__(self,
+        body=StringIO.StringIO(response.read()), status=response.status,
+        reason=response.reason, headers=headers)
+
+  def getheader(self, name, default=None):
+    return self._headers.get(name.lower(), default)
+
+
 class BasicAuthToken(atom.http_interface.GenericToken):
   def __init__(self, auth_header, scopes=None):
     """Creates a token used to add Basic Auth headers to HTTP requests.
@@ -402,10 +463,10 @@ def PrepareConnection(service, full_uri):
       if not proxy_password:
         proxy_password = os.environ.get('proxy_password')
       if proxy_username:
-        user_auth = base64.encodestring('%s:%s' % (proxy_username,
-                                                   proxy_password))
+        user_auth = base64.b64encode('%s:%s' % (proxy_username,
+                                                proxy_password))
         proxy_authorization = ('Proxy-authorization: Basic %s\r\n' % (
-            user_auth.strip()))
+            user_auth))
       else:
         proxy_authorization = ''
       proxy_connect = 'CONNECT %s:%s HTTP/1.0\r\n' % (server, port)
@@ -484,8 +545,7 @@ def UseBasicAuth(service, username, password, for_proxy=False):
     password: str
   """
   deprecation('calling deprecated function UseBasicAuth')
-  base_64_string = base64.encodestring('%s:%s' % (username, password))
-  base_64_string = base_64_string.strip()
+  base_64_string = base64.b64encode('%s:%s' % (username, password))
   if for_proxy:
     header_name = 'Proxy-Authorization'
   else:
@@ -542,16 +602,14 @@ def DictionaryToParamList(url_parameters, escape_params=True):
     A list which contains a string for each key-value pair. The strings are
     ready to be incorporated into a URL by using '&'.join([] + parameter_list)
   """
-  # Choose which function to use when modifying the query and parameters.
-  # Use quote_plus when escape_params is true.
-  transform_op = [str, urllib.quote_plus][bool(escape_params)]
-  # Create a list of tuples containing the escaped version of the
-  # parameter-value pairs.
-  parameter_tuples = [(transform_op(param), transform_op(value))
-                     for param, value in (url_parameters or {}).items()]
-  # Turn parameter-value tuples into a list of strings in the form
-  # 'PARAMETER=VALUE'.
-  return ['='.join(x) for x in parameter_tuples]
+  if not url_parameters:
+    return []
+  if escape_params:
+    # urlencode escapes any & in the keys and values, so splitting its
+    # output yields exactly one string per key-value pair.
+    return urllib.urlencode(url_parameters).split('&')
+  return ['%s=%s' % (param, value)
+          for param, value in url_parameters.iteritems()]
 
 
 def BuildUri(uri, url_params=None, escape_params=True):
@@ -580,23 +638,22 @@ def BuildUri(uri, url_params=None, escape_params=True):
     string The URI consisting of the escaped URL parameters appended to the
     initial uri string.
   """
+  if not url_params:
+    return uri
+
   # Prepare URL parameters for inclusion into the GET request.
-  parameter_list = DictionaryToParamList(url_params, escape_params)
-
-  # Append the URL parameters to the URL.
-  if parameter_list:
-    if uri.find('?') != -1:
-      # If there are already URL parameters in the uri string, add the
-      # parameters after a new & character.
-      full_uri = '&'.join([uri] + parameter_list)
-    else:
-      # The uri string did not have any URL parameters (no ? character)
-      # so put a ? between the uri and URL parameters.
-      full_uri = '%s%s' % (uri, '?%s' % ('&'.join([] + parameter_list)))  
+  if escape_params:
+    parameter_string = urllib.urlencode(url_params)
   else:
-    full_uri = uri
-        
-  return full_uri
+    parameter_string = '&'.join(['%s=%s' % (param, value)
+                                 for param, value in url_params.iteritems()])
+
+  # Append the URL parameters to the URL. If there are already URL parameters
+  # in the uri string, add the parameters after a new & character, otherwise
+  # put a ? between the uri and URL parameters.
+  if '?' in uri:
+    return '&'.join((uri, parameter_string))
+  return '?'.join((uri, parameter_string))
 
   
 def HttpRequest(service, operation, data, uri, extra_headers=None, 
@@ -668,12 +725,10 @@ def HttpRequest(service, operation, data, uri, extra_headers=None,
     extra_headers['Content-Type'] = content_type 
 
   # Send the HTTP headers.
-  if isinstance(service.additional_headers, dict):
-    for header in service.additional_headers:
-      connection.putheader(header, service.additional_headers[header])
-  if isinstance(extra_headers, dict):
-    for header in extra_headers:
-      connection.putheader(header, extra_headers[header])
+  for header, value in service.additional_headers.iteritems():
+    connection.putheader(header, value)
+  for header, value in extra_headers.iteritems():
+    connection.putheader(header, value)
   connection.endheaders()
 
   # If there is data, send it in the request.
@@ -24,6 +24,26 @@ import urllib
 
 DEFAULT_PROTOCOL = 'http'
 DEFAULT_PORT = 80
+# Upper bound on the number of escaped strings kept by _quote_plus.
+MAX_QUOTE_CACHE_SIZE = 4096
+
+
+_quote_cache = {}
+
+
+def _quote_plus(value):
+  """Memoized urllib.quote_plus for URL parameter keys and values.
+
+  Paging through a feed sends the same parameter names and mostly the same
+  values with every request, so the escaped forms are cached. The cache is
+  emptied once it holds MAX_QUOTE_CACHE_SIZE entries.
+  """
+  quoted = _quote_cache.get(value)
+  if quoted is None:
+    if len(_quote_cache) >= MAX_QUOTE_CACHE_SIZE:
+      _quote_cache.clear()
+    quoted = _quote_cache[value] = urllib.quote_plus(value)
+  return quoted
 
 
 def parse_url(url_string):
@@ -32,20 +52,22 @@ def parse_url(url_string):
   This method can accept partial URLs, but it will leave missing
   members of the Url unset.
   """
-  parts = urlparse.urlparse(url_string)
+  # urlsplit does not separate ;parameters from the path, which would
+  # otherwise be dropped, and is cheaper than urlparse.
+  scheme, netloc, path, query, fragment = urlparse.urlsplit(url_string)
   url = Url()
-  if parts[0]:
-    url.protocol = parts[0]
-  if parts[1]:
-    host_parts = parts[1].split(':')
+  if scheme:
+    url.protocol = scheme
+  if netloc:
+    host_parts = netloc.split(':', 1)
     if host_parts[0]:
       url.host = host_parts[0]
     if len(host_parts) > 1:
       url.port = host_parts[1]
-  if parts[2]:
-    url.path = parts[2]
-  if parts[4]:
-    param_pairs = parts[4].split('&')
+  if path:
+    url.path = path
+  if query:
+    param_pairs = query.split('&')
     for pair in param_pairs:
       pair_parts = pair.split('=')
       if len(pair_parts) > 1:
@@ -89,8 +111,8 @@ class Url(object):
   def get_param_string(self):
     param_pairs = []
     for key, value in self.params.iteritems():
-      param_pairs.append('='.join((urllib.quote_plus(key), 
-          urllib.quote_plus(str(value)))))
+      param_pairs.append('='.join((_quote_plus(key), 
+          _quote_plus(str(value)))))
     return '&'.join(param_pairs)
 
   def get_request_uri(self):
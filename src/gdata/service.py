@@ -102,6 +102,8 @@ CLIENT_LOGIN_SCOPES = gdata.gauth.AUTH_SCOPES
 DEFAULT_NUM_RETRIES = 3
 DEFAULT_DELAY = 1
 DEFAULT_BACKOFF = 2
+# Extracts the gsessionid URL parameter from the Location of a redirect.
+_find_gsessionid = re.compile(r'[\?\&]gsessionid=(\w*\-)').search
 
 
 def lookup_scopes(service_name):
@@ -1090,7 +1092,7 @@ class GDataService(atom.service.AtomService):
         location = (server_response.getheader('Location')
                     or server_response.getheader('location'))
         if location is not None:
-          m = re.compile('[\?\&]gsessionid=(\w*\-)').search(location)
+          m = _find_gsessionid(location)
           if m is not None:
             self.__gsessionid = m.group(1)
           return GDataService.Get(self, location, extra_headers, redirects_remaining - 1, 
@@ -1339,7 +1341,7 @@ class GDataService(atom.service.AtomService):
         location = (server_response.getheader('Location')
                     or server_response.getheader('location'))
         if location is not None:
-          m = re.compile('[\?\&]gsessionid=(\w*\-)').search(location)
+          m = _find_gsessionid(location)
           if m is not None:
             self.__gsessionid = m.group(1) 
           return GDataService.PostOrPut(self, verb, data, location, 
@@ -1437,7 +1439,7 @@ class GDataService(atom.service.AtomService):
         location = (server_response.getheader('Location')
                     or server_response.getheader('location'))
         if location is not None:
-          m = re.compile('[\?\&]gsessionid=(\w*\-)').search(location)
+          m = _find_gsessionid(location)
           if m is not None:
             self.__gsessionid = m.group(1) 
           return GDataService.Delete(self, location, extra_headers, 
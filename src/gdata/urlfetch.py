@@ -101,7 +101,7 @@ class AppEngineHttpClient(atom.http_interface.GenericHttpClient):
     # If the list of headers does not include a Content-Length, attempt to
     # calculate it based on the data object.
     if data and 'Content-Length' not in all_headers:
-      all_headers['Content-Length'] = len(data_str)
+      all_headers['Content-Length'] = str(len(data_str))
 
     # Set the content type to the default value if none was set.
     if 'Content-Type' not in all_headers:
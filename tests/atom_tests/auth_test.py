@@ -36,6 +36,10 @@ class BasicAuthTest(unittest.TestCase):
     self.assert_(http_request.headers[
         'Authorization'] == 'Basic QWxhZGRpbjpvcGVuIHNlc2FtZQ==')
 
+  def test_long_credentials(self):
+    credentials = atom.auth.BasicAuth('a' * 40, 'b' * 40)
+    self.assert_('\n' not in credentials.basic_cookie)
+
 
 def suite():
   return unittest.TestSuite((unittest.makeSuite(BasicAuthTest,'test'),))
@@ -0,0 +1,278 @@
+#!/usr/bin/python
+#
+# Copyright (C) 2008 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+__author__ = 'j.s@google.com (Jeff Scudder)'
+
+
+import httplib
+import socket
+import StringIO
+import unittest
+import atom.http
+import atom.url
+import gdata.test_config as conf
+
+
+class StubResponse(object):
+
+  def __init__(self):
+    self._closed = False
+
+  def read(self):
+    self._closed = True
+    return ''
+
+  def isclosed(self):
+    return self._closed
+
+
+class StubConnection(object):
+  """Records requests in place of an httplib.HTTPConnection.
+
+  Exceptions added to errors are raised, one per request, when the response
+  is read.
+  """
+
+  def __init__(self):
+    self.sock = None
+    self.requests = []
+    self.sent = []
+    self.errors = []
+    self.closed = False
+
+  def set_debuglevel(self, level):
+    pass
+
+  def request(self, method, url, body=None, headers=None):
+    self.requests.append((method, url, body, headers.copy()))
+
+  def send(self, data):
+    self.sent.append(data)
+
+  def getresponse(self):
+    if self.errors:
+      raise self.errors.pop(0)
+    # The socket stays open after a successful request. The other end of the
+    # socket pair stands in for the server.
+    if self.sock is None:
+      self.sock, self.server_sock = socket.socketpair()
+    return StubResponse()
+
+  def close(self):
+    self.closed = True
+    if self.sock is not None:
+      self.sock.close()
+      self.server_sock.close()
+    self.sock = None
+
+
+class StubHttpClient(atom.http.HttpClient):
+
+  def __init__(self):
+    atom.http.HttpClient.__init__(self)
+    self.connections = []
+
+  def _create_connection(self, url):
+    connection = StubConnection()
+    self.connections.append(connection)
+    return connection
+
+
+class FakeSocket(object):
+  """Records what httplib writes and replies with a canned response."""
+
+  def __init__(self, response):
+    self.sent = []
+    self._response = response
+
+  def sendall(self, data):
+    self.sent.append(str(data))
+
+  def makefile(self, mode, bufsize=None):
+    return StringIO.StringIO(self._response)
+
+  def close(self):
+    pass
+
+
+class FakeSocketHttpClient(atom.http.HttpClient):
+  """Uses real httplib connections which talk to a FakeSocket."""
+
+  def __init__(self):
+    atom.http.HttpClient.__init__(self)
+    self.sockets = []
+
+  def _create_connection(self, url):
+    connection = atom.http.HttpClient._create_connection(self, url)
+    connection.sock = FakeSocket(
+        'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok')
+    self.sockets.append(connection.sock)
+    return connection
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+  def setUp(self):
+    self.client = StubHttpClient()
+
+  def testConnectionIsReusedOnceResponseIsRead(self):
+    self.client.request('GET', 'http://example.com/a').read()
+    self.client.request('GET', 'http://example.com/b').read()
+    self.assertEqual(len(self.client.connections), 1)
+    self.assertEqual(len(self.client.connections[0].requests), 2)
+
+  def testConnectionWithUnreadResponseIsNotReused(self):
+    self.client.request('GET', 'http://example.com/a')
+    self.client.request('GET', 'http://example.com/b')
+    self.assertEqual(len(self.client.connections), 2)
+
+  def testConnectionsArePooledPerServer(self):
+    for url in ('http://example.com/a', 'http://example.com/b',
+                'https://example.com/a', 'http://example.com:8080/a'):
+      self.client.request('GET', url).read()
+    self.assertEqual(len(self.client.connections), 3)
+
+  def testConnectionInUseIsNotSharedBetweenThreads(self):
+    self.client.request('GET', 'http://example.com/a').read()
+    url = atom.url.parse_url('http://example.com/a')
+    first = self.client._prepare_connection(url, {})
+    second = self.client._prepare_connection(url, {})
+    self.assert_(first is self.client.connections[0])
+    self.assert_(second is not first)
+
+  def testFailedConnectionIsClosedAndDropped(self):
+    self.client.request('GET', 'http://example.com/a').read()
+    connection = self.client.connections[0]
+    connection.errors.append(ValueError())
+    self.assertRaises(ValueError, self.client.request, 'GET',
+                      'http://example.com/a')
+    self.assert_(connection.closed)
+    self.client.request('GET', 'http://example.com/a').read()
+    self.assertEqual(len(self.client.connections), 2)
+    self.assertEqual(len(self.client.connections[1].requests), 1)
+
+  def testStaleConnectionIsRetriedForGet(self):
+    self.client.request('GET', 'http://example.com/a').read()
+    self.client.connections[0].errors.append(httplib.BadStatusLine(''))
+    self.client.request('GET', 'http://example.com/a').read()
+    self.assert_(self.client.connections[0].closed)
+    self.assertEqual(len(self.client.connections), 2)
+    self.assertEqual(len(self.client.connections[1].requests), 1)
+
+  def testConnectionClosedByServerIsNotReused(self):
+    self.client.request('GET', 'http://example.com/a').read()
+    stale = self.client.connections[0]
+    stale.server_sock.close()
+    self.client.request('POST', 'http://example.com/a',
+                        data='<entry/>').read()
+    self.assert_(stale.closed)
+    self.assertEqual(len(self.client.connections), 2)
+    self.assertEqual(self.client.connections[1].requests[0][0], 'POST')
+
+  def testStaleConnectionIsNotRetriedForPost(self):
+    self.client.request('GET', 'http://example.com/a').read()
+    self.client.connections[0].errors.append(httplib.BadStatusLine(''))
+    self.assertRaises(httplib.BadStatusLine, self.client.request, 'POST',
+                      'http://example.com/a', data='<entry/>')
+    self.assertEqual(len(self.client.connections), 1)
+
+  def testNewConnectionIsNotRetried(self):
+    self.client.request('GET', 'http://example.com/a').read()
+    self.client.connections[0].errors.append(httplib.BadStatusLine(''))
+    self.client.connections[0].sock = None
+    self.assertRaises(httplib.BadStatusLine, self.client.request, 'GET',
+                      'http://example.com/a')
+    self.assertEqual(len(self.client.connections), 1)
+
+
+class SendRequestTest(unittest.TestCase):
+
+  def setUp(self):
+    self.client = StubHttpClient()
+
+  def _get_host_header(self, url):
+    self.client.request('GET', url).read()
+    return self.client.connections[-1].requests[-1][3]['Host']
+
+  def testHostHeader(self):
+    self.assertEqual(self._get_host_header('https://example.com/'),
+                     'example.com')
+    self.assertEqual(self._get_host_header('https://example.com:443/'),
+                     'example.com')
+    self.assertEqual(self._get_host_header('http://example.com:80/'),
+                     'example.com:80')
+    self.assertEqual(self._get_host_header('https://example.com:8443/'),
+                     'example.com:8443')
+    self.assertEqual(self._get_host_header('http://example.com:8080/'),
+                     'example.com:8080')
+
+  def testStringBodyIsSentWithRequest(self):
+    self.client.request('POST', 'http://example.com/feed', data='<entry/>')
+    connection = self.client.connections[0]
+    method, uri, body, headers = connection.requests[0]
+    self.assertEqual(method, 'POST')
+    self.assertEqual(uri, 'http://example.com/feed')
+    self.assertEqual(body, '<entry/>')
+    self.assertEqual(headers['Content-Length'], '8')
+    self.assertEqual(connection.sent, [])
+
+  def testLargeBodyIsSentAsBufferOverHttpOnly(self):
+    small = 'x' * atom.http.LARGE_BODY_SIZE
+    large = small + 'x'
+    for url in ('http://example.com/feed', 'https://example.com/feed'):
+      for data in (small, large):
+        self.client.request('PUT', url, data=data).read()
+    bodies = [r[2] for r in self.client.connections[0].requests]
+    self.assertEqual(type(bodies[0]), str)
+    self.assertEqual(type(bodies[1]), buffer)
+    self.assertEqual(str(bodies[1]), large)
+    bodies = [r[2] for r in self.client.connections[1].requests]
+    self.assertEqual(type(bodies[0]), str)
+    self.assertEqual(type(bodies[1]), str)
+
+  def testListAndFileBodiesAreSentAfterHeaders(self):
+    self.client.request('PUT', 'http://example.com/feed',
+        data=['<entry>', StringIO.StringIO('x'), '</entry>'],
+        headers={'Content-Length': '16'})
+    self.client.request('PUT', 'http://example.com/feed',
+        data=StringIO.StringIO('<entry/>'), headers={'Content-Length': '8'})
+    first, second = self.client.connections
+    self.assertEqual(first.requests[0][2], None)
+    self.assertEqual(first.sent, ['<entry>', 'x', '</entry>'])
+    self.assertEqual(second.requests[0][2], None)
+    self.assertEqual(second.sent, ['<entry/>'])
+
+
+class HttpConnectionTest(unittest.TestCase):
+
+  def testUnicodeUrlWithNonAsciiBody(self):
+    client = FakeSocketHttpClient()
+    body = '<entry><title>caf\xc3\xa9</title></entry>'
+    response = client.request('POST', u'http://example.com/feed', data=body)
+    self.assertEqual(response.read(), 'ok')
+    request = ''.join(client.sockets[0].sent)
+    self.assert_(request.startswith('POST http://example.com/feed HTTP/1.1'))
+    self.assert_(request.endswith('\r\n\r\n' + body))
+
+
+def suite():
+  return conf.build_suite([ConnectionPoolTest, SendRequestTest,
+                           HttpConnectionTest])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -20,6 +20,7 @@ import os
 import unittest
 import atom.service
 import atom.mock_http_core
+import gdata.service
 import gdata.test_config as conf
 
 class AtomServiceUnitTest(unittest.TestCase):
@@ -50,6 +51,13 @@ class AtomServiceUnitTest(unittest.TestCase):
     self.assert_(x.index('foo=bar') != -1)
 
 
+  def testBuildUriWithNonStringParams(self):
+    x = atom.service.BuildUri('/base/feeds/snippets',
+                              url_params={'max-results': 25})
+    self.assertEquals(x, '/base/feeds/snippets?max-results=25')
+    x = atom.service.BuildUri('/base/feeds/snippets', url_params={})
+    self.assertEquals(x, '/base/feeds/snippets')
+
   def testBuildUriWithoutParameterEscaping(self):
     x = atom.service.BuildUri('/base/feeds/snippets', 
             url_params={'foo': ' bar', 'bq': 'digital camera'}, 
@@ -57,6 +65,13 @@ class AtomServiceUnitTest(unittest.TestCase):
     self.assert_(x.index('foo= bar') != -1)
     self.assert_(x.index('bq=digital camera') != -1)
 
+  def testDictionaryToParamList(self):
+    self.assertEqual(atom.service.DictionaryToParamList(None), [])
+    self.assertEqual(atom.service.DictionaryToParamList(
+        {'bq': 'digital&camera'}), ['bq=digital%26camera'])
+    self.assertEqual(atom.service.DictionaryToParamList(
+        {'bq': 'digital camera'}, escape_params=False), ['bq=digital camera'])
+
   def testParseHttpUrl(self):
     atom_service = atom.service.AtomService('code.google.com')
     self.assertEquals(atom_service.server, 'code.google.com')
@@ -117,6 +132,9 @@ class AtomServiceUnitTest(unittest.TestCase):
     token = client.token_store.find_token('http://')
     self.assert_(isinstance(token, atom.service.BasicAuthToken))
     self.assertEquals(token.auth_header, 'Basic Og==')
+    client.UseBasicAuth('a' * 40, 'b' * 40)
+    token = client.token_store.find_token('http://')
+    self.assert_('\n' not in token.auth_header)
 
   def testProcessUrlWithStringForService(self):
     (server, port, ssl, uri) = atom.service.ProcessUrl(
@@ -154,6 +172,50 @@ class AtomServiceUnitTest(unittest.TestCase):
     response = client.Get('http://example.com:1234')
     self.assertEqual(response.getheader('Echo-Host'), 'example.com:1234')
 
+  def testPostSerializesElementOnce(self):
+    client = atom.service.AtomService()
+    client.http_client.v2_http_client = atom.mock_http_core.EchoHttpClient()
+    element = atom.service.ElementTree.Element('entry')
+    element.text = 'hi'
+    response = client.Post(element, 'http://example.com/feed')
+    self.assertEqual(response.read(), '<entry>hi</entry>')
+    self.assertEqual(response.getheader('Content-Length'), '17')
+
+  def testPostAndPutWithoutExtraHeaders(self):
+    client = atom.service.AtomService()
+    client.http_client.v2_http_client = atom.mock_http_core.EchoHttpClient()
+    response = client.Post('<entry/>', 'http://example.com/feed')
+    self.assertEqual(response.getheader('Content-Type'),
+                     'application/atom+xml')
+    self.assertEqual(response.getheader('Content-Length'), '8')
+    response = client.Put('<entry/>', 'http://example.com/feed/1',
+                          content_type=None)
+    self.assertEqual(response.getheader('Echo-Method'), 'PUT')
+    self.assertEqual(response.getheader('Content-Length'), '8')
+
+  def testGetResponses(self):
+    client = atom.service.AtomService()
+    client.http_client.v2_http_client = atom.mock_http_core.EchoHttpClient()
+    responses = client.GetResponses(['http://example.com/a',
+                                     'http://example.com/b?x=1'],
+                                    url_params={'y': '2'})
+    self.assertEqual(len(responses), 2)
+    self.assertEqual(responses[0].status, 200)
+    self.assertEqual(responses[0].getheader('Echo-Uri'), '/a?y=2')
+    self.assertEqual(responses[0].getheader('echo-uri'), '/a?y=2')
+    self.assertEqual(responses[1].getheader('Echo-Method'), 'GET')
+    self.assertEqual(responses[1].getheader('Content-Type'),
+                     'application/atom+xml')
+
+  def testGetResponsesOnGDataService(self):
+    client = gdata.service.GDataService(server='example.com')
+    client.http_client.v2_http_client = atom.mock_http_core.EchoHttpClient()
+    responses = client.GetResponses(['/a', '/b'])
+    self.assertEqual(len(responses), 2)
+    self.assertEqual(responses[1].getheader('Echo-Host'), 'example.com:None')
+    self.assertEqual(responses[1].getheader('Echo-Uri'), '/b')
+    self.assertEqual(responses[1].read(), '')
+
   def testBadHttpsProxyRaisesRealException(self):
     """Test that real exceptions are raised when there is an error connecting to
     a host with an https proxy
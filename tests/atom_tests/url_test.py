@@ -52,6 +52,10 @@ class UrlTest(unittest.TestCase):
     self.assert_(len(url.params.keys()) == 1)
     self.assert_('my foo' in url.params)
     self.assert_(url.params['my foo'] == 'bar=x')
+
+    url = atom.url.parse_url('http://example.com/feeds;projection?foo=bar')
+    self.assert_(url.path == '/feeds;projection')
+    self.assert_(url.params == {'foo': 'bar'})
    
   def testUrlToString(self):
     url = atom.url.Url(port=80)
@@ -71,6 +75,12 @@ class UrlTest(unittest.TestCase):
     self.assert_(url.get_param_string() == (
         'has+spaces=sneaky%3Dvalues%3F%26%21'))
 
+  def testQuoteCacheIsBounded(self):
+    atom.url._quote_cache.clear()
+    for i in xrange(atom.url.MAX_QUOTE_CACHE_SIZE + 1):
+      self.assertEqual(atom.url._quote_plus('a b%s' % i), 'a+b%s' % i)
+    self.assert_(len(atom.url._quote_cache) <= atom.url.MAX_QUOTE_CACHE_SIZE)
+
   def testComparistons(self):
     url1 = atom.url.Url(protocol='http', host='example.com', path='/feed', 
                         params={'x':'1', 'y':'2'})
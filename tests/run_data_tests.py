@@ -9,6 +9,7 @@ import getpass
 import gdata_test
 import atom_test
 import atom_tests.http_interface_test
+import atom_tests.http_test
 import atom_tests.mock_http_test
 import atom_tests.token_store_test
 import atom_tests.url_test
@@ -37,6 +38,7 @@ def RunAllTests():
   test_runner = module_test_runner.ModuleTestRunner()
   test_runner.modules = [gdata_test, atom_test, atom_tests.url_test, 
                          atom_tests.http_interface_test, 
+                         atom_tests.http_test,
                          atom_tests.mock_http_test, 
                          atom_tests.core_test,
                          atom_tests.token_store_test,